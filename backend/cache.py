@@ -0,0 +1,51 @@
+import time
+
+############################################
+#
+#   In-process query cache
+#
+############################################
+
+class QueryCache:
+    """Small TTL cache for hot read endpoints.
+
+    Entries are keyed by the caller-supplied string plus a per-namespace
+    version counter; mutating endpoints bump the counter via invalidate(),
+    which makes every key built against the old version unreachable in O(1)
+    without scanning the store. Stale entries are dropped lazily on lookup.
+
+    The store and counters are process-local, so with several workers an
+    invalidation only reaches the worker that performed the write; the ttl
+    bounds how stale the other workers can get. A ttl of 0 (or less)
+    disables caching entirely.
+    """
+
+    def __init__(self, ttl: float = 30.0):
+        self.ttl = ttl
+        self._store = {}
+        self._versions = {}
+
+    def version(self, namespace: str) -> int:
+        """Current version counter for a namespace (e.g. 'book')."""
+        return self._versions.get(namespace, 0)
+
+    def invalidate(self, *namespaces: str) -> None:
+        """Bump the version counter so all keys built on it become stale."""
+        for namespace in namespaces:
+            self._versions[namespace] = self._versions.get(namespace, 0) + 1
+
+    def get(self, key: str):
+        """Return the cached value, or None if missing or expired."""
+        entry = self._store.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._store.pop(key, None)
+            return None
+        return value
+
+    def set(self, key: str, value) -> None:
+        if self.ttl <= 0:
+            return
+        self._store[key] = (time.monotonic() + self.ttl, value)
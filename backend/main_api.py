@@ -1,18 +1,34 @@
 import uvicorn
 import os, json
+import itertools
+import orjson
+import atexit
+import queue
 import time as time_module
 import logging
-from fastapi import Depends, FastAPI, HTTPException, Request, status, Body
+from logging.handlers import QueueHandler, QueueListener
+from fastapi import Depends, FastAPI, HTTPException, Request, Response, status, Body
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from sqlalchemy import create_engine
-from sqlalchemy.orm import Session, sessionmaker
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
+from sqlalchemy import bindparam, event, exists, insert, select, delete, update, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.orm import selectinload
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from pydantic_classes import *
 from sql_alchemy import *
+from cache import QueryCache
 
-# Configure logging
+# Configure logging; route records through a queue so the blocking stream
+# write happens on a background thread instead of the event loop
 logging.basicConfig(level=logging.INFO)
+_log_queue = queue.Queue(-1)
+_log_listener = QueueListener(_log_queue, *logging.getLogger().handlers)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+logging.getLogger().handlers = [QueueHandler(_log_queue)]
 logger = logging.getLogger(__name__)
 
 ############################################
@@ -21,21 +37,53 @@ logger = logging.getLogger(__name__)
 #
 ############################################
 
+# Rows bound per bulk INSERT statement; keeps the working set of large bulk
+# payloads O(batch) instead of O(payload)
+BULK_INSERT_BATCH_SIZE = 1000
+
 def init_db():
-    SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./data/Class_Diagram.db")
+    SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./data/Class_Diagram.db")
+    # Upgrade plain sqlite:// / postgres:// URLs (e.g. from docker-compose
+    # or a hosting provider) to the async drivers
+    if SQLALCHEMY_DATABASE_URL.startswith("sqlite://"):
+        SQLALCHEMY_DATABASE_URL = SQLALCHEMY_DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    elif SQLALCHEMY_DATABASE_URL.startswith("postgres://"):
+        SQLALCHEMY_DATABASE_URL = SQLALCHEMY_DATABASE_URL.replace("postgres://", "postgresql+asyncpg://", 1)
+    elif SQLALCHEMY_DATABASE_URL.startswith("postgresql://"):
+        SQLALCHEMY_DATABASE_URL = SQLALCHEMY_DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
     # Ensure local SQLite directory exists (safe no-op for other DBs)
     os.makedirs("data", exist_ok=True)
-    engine = create_engine(
-        SQLALCHEMY_DATABASE_URL, 
-        connect_args={"check_same_thread": False},
-        pool_size=10,
-        max_overflow=20,
+    connect_args = {}
+    if SQLALCHEMY_DATABASE_URL.startswith("postgresql+asyncpg://"):
+        # Required behind PgBouncer transaction pooling, where consecutive
+        # statements may land on different backend connections
+        connect_args["prepared_statement_cache_size"] = 0
+    engine = create_async_engine(
+        SQLALCHEMY_DATABASE_URL,
+        # Per-worker pool; keep DB_POOL_SIZE/DB_MAX_OVERFLOW small (e.g. 5/5)
+        # when an external pooler such as PgBouncer fronts the database
+        pool_size=int(os.getenv("DB_POOL_SIZE", "10")),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "20")),
         pool_pre_ping=True,
-        echo=False
+        echo=False,
+        # Keep driver-side executemany batches bounded as well
+        insertmanyvalues_page_size=BULK_INSERT_BATCH_SIZE,
+        connect_args=connect_args
     )
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    Base.metadata.create_all(bind=engine)
-    return SessionLocal
+    if engine.url.get_backend_name() == "sqlite":
+        # WAL lets readers run concurrently with a writer and
+        # synchronous=NORMAL drops one fsync per commit
+        @event.listens_for(engine.sync_engine, "connect")
+        def _sqlite_pragmas(dbapi_conn, _):
+            cur = dbapi_conn.cursor()
+            cur.execute("PRAGMA journal_mode=WAL")
+            cur.execute("PRAGMA synchronous=NORMAL")
+            cur.execute("PRAGMA busy_timeout=5000")
+            cur.execute("PRAGMA cache_size=-65536")
+            cur.execute("PRAGMA temp_store=MEMORY")
+            cur.close()
+    SessionLocal = async_sessionmaker(engine, autocommit=False, autoflush=False, expire_on_commit=False)
+    return engine, SessionLocal
 
 app = FastAPI(
     title="Class_Diagram API",
@@ -43,6 +91,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
     openapi_tags=[
         {"name": "System", "description": "System health and statistics"},
         {"name": "Book", "description": "Operations for Book entities"},
@@ -64,30 +113,45 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large JSON payloads (detailed/paginated listings); small responses
+# skip compression entirely
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 ############################################
 #
 #   Middleware
 #
 ############################################
 
-# Request logging middleware
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    """Log all incoming requests and responses."""
-    logger.info(f"Incoming request: {request.method} {request.url.path}")
-    response = await call_next(request)
-    logger.info(f"Response status: {response.status_code}")
-    return response
-
-# Request timing middleware
-@app.middleware("http")
-async def add_process_time_header(request: Request, call_next):
-    """Add processing time header to all responses."""
-    start_time = time_module.time()
-    response = await call_next(request)
-    process_time = time_module.time() - start_time
-    response.headers["X-Process-Time"] = str(process_time)
-    return response
+# Combined request logging + timing middleware. Implemented as a pure ASGI
+# class instead of two @app.middleware("http") functions, which each wrap the
+# app in a BaseHTTPMiddleware layer with a per-request task group and stream.
+class TimingLogMiddleware:
+    """Log all incoming requests/responses and add a processing time header."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Incoming request: %s %s", scope["method"], scope["path"])
+        start_time = time_module.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                process_time = time_module.perf_counter() - start_time
+                message["headers"].append((b"x-process-time", f"{process_time:.6f}".encode()))
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("Response status: %s", message["status"])
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+app.add_middleware(TimingLogMiddleware)
 
 ############################################
 #
@@ -113,10 +177,10 @@ async def value_error_handler(request: Request, exc: ValueError):
 async def integrity_error_handler(request: Request, exc: IntegrityError):
     """Handle database integrity errors."""
     logger.error(f"Database integrity error: {exc}")
-    
+
     # Extract more detailed error information
     error_detail = str(exc.orig) if hasattr(exc, 'orig') else str(exc)
-    
+
     return JSONResponse(
         status_code=status.HTTP_409_CONFLICT,
         content={
@@ -134,7 +198,7 @@ async def sqlalchemy_error_handler(request: Request, exc: SQLAlchemyError):
     return JSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={
-            "error": "Internal Server Error", 
+            "error": "Internal Server Error",
             "message": "Database operation failed",
             "detail": "An internal database error occurred"
         }
@@ -153,19 +217,59 @@ async def http_exception_handler(request: Request, exc: HTTPException):
         }
     )
 
-# Initialize database session
-SessionLocal = init_db()
-# Dependency to get DB session
-def get_db():
-    db = SessionLocal()
-    try:
+# Initialize database engine and session factory
+engine, SessionLocal = init_db()
+
+# Short-TTL cache for read-heavy endpoints; mutating endpoints bump the
+# per-entity namespace version to invalidate. The cache is per process:
+# under the multi-worker launch in __main__ a write only invalidates the
+# worker that handled it, so other workers can serve responses up to the
+# TTL stale. Set QUERY_CACHE_TTL=0 to disable caching where strict
+# read-your-writes across workers matters more than the saved queries.
+query_cache = QueryCache(ttl=float(os.getenv("QUERY_CACHE_TTL", "30")))
+
+@app.on_event("startup")
+async def create_tables():
+    """Create database tables on startup (async engines cannot run DDL at import time)."""
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+# Dependency to get DB session. The plain context-manager form keeps
+# per-request dependency overhead minimal; closing the session already rolls
+# back any uncommitted work, so no extra teardown bookkeeping is needed.
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    except Exception:
-        db.rollback()
-        logger.error("Database session rollback due to exception")
-        raise
-    finally:
-        db.close()
+
+############################################
+#
+#   Precompiled statements
+#
+############################################
+
+# Built once at import; handlers pass parameters at execution time so the
+# Core expression tree is not rebuilt on every request
+AUTHOR_IDS_BY_BOOK = select(books_1.c.authors).where(books_1.c.books == bindparam("book_id"))
+LIBRARY_IDS_BY_BOOK = select(books.c.library).where(books.c.books == bindparam("book_id"))
+BOOK_IDS_BY_AUTHOR = select(books_1.c.books).where(books_1.c.authors == bindparam("author_id"))
+BOOK_IDS_BY_LIBRARY = select(books.c.books).where(books.c.library == bindparam("library_id"))
+
+# Association maintenance statements shared by the relationship endpoints
+BOOK_AUTHOR_ASSOC_EXISTS = books_1.select().where(
+    (books_1.c.books == bindparam("book_id")) & (books_1.c.authors == bindparam("author_id")))
+BOOK_LIBRARY_ASSOC_EXISTS = books.select().where(
+    (books.c.books == bindparam("book_id")) & (books.c.library == bindparam("library_id")))
+# ON CONFLICT is a dialect-specific construct; pick the insert that compiles
+# on the backend the engine actually connects to
+_insert_on_conflict = pg_insert if engine.dialect.name == "postgresql" else sqlite_insert
+INSERT_BOOK_AUTHOR_ASSOC = _insert_on_conflict(books_1).values(
+    books=bindparam("book_id"), authors=bindparam("author_id")).on_conflict_do_nothing()
+INSERT_BOOK_LIBRARY_ASSOC = _insert_on_conflict(books).values(
+    books=bindparam("book_id"), library=bindparam("library_id")).on_conflict_do_nothing()
+DELETE_BOOK_AUTHOR_ASSOC = books_1.delete().where(
+    (books_1.c.books == bindparam("book_id")) & (books_1.c.authors == bindparam("author_id")))
+DELETE_BOOK_LIBRARY_ASSOC = books.delete().where(
+    (books.c.books == bindparam("book_id")) & (books.c.library == bindparam("library_id")))
 
 ############################################
 #
@@ -195,13 +299,27 @@ def health_check():
 
 
 @app.get("/statistics", tags=["System"])
-def get_statistics(database: Session = Depends(get_db)):
+async def get_statistics(database: AsyncSession = Depends(get_db)):
     """Get database statistics for all entities"""
-    stats = {}
-    stats["book_count"] = database.query(Book).count()
-    stats["author_count"] = database.query(Author).count()
-    stats["library_count"] = database.query(Library).count()
+    cache_key = (f"statistics:{query_cache.version('book')}:"
+                 f"{query_cache.version('author')}:{query_cache.version('library')}")
+    cached = query_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    # Single round trip: one SELECT with a scalar count subquery per table
+    row = (await database.execute(select(
+        select(func.count()).select_from(Book).scalar_subquery().label("book_count"),
+        select(func.count()).select_from(Author).scalar_subquery().label("author_count"),
+        select(func.count()).select_from(Library).scalar_subquery().label("library_count"),
+    ))).one()
+    stats = {
+        "book_count": row.book_count,
+        "author_count": row.author_count,
+        "library_count": row.library_count,
+    }
     stats["total_entities"] = sum(stats.values())
+    query_cache.set(cache_key, stats)
     return stats
 
 ############################################
@@ -209,80 +327,90 @@ def get_statistics(database: Session = Depends(get_db)):
 #   Book functions
 #
 ############################################
- 
- 
- 
- 
+
+
+
+
 
 @app.get("/book/", response_model=None, tags=["Book"])
-def get_all_book(detailed: bool = False, database: Session = Depends(get_db)) -> list:
-    from sqlalchemy.orm import joinedload
-    
+async def get_all_book(detailed: bool = False, database: AsyncSession = Depends(get_db)) -> list:
     # Use detailed=true to get entities with eagerly loaded relationships (for tables with lookup columns)
     if detailed:
-        # Eagerly load all relationships to avoid N+1 queries
-        query = database.query(Book)
-        book_list = query.all()
-        
-        # Serialize with relationships included
-        result = []
-        for book_item in book_list:
-            item_dict = book_item.__dict__.copy()
-            item_dict.pop('_sa_instance_state', None)
-            
-            # Add many-to-one relationships (foreign keys for lookup columns)
-            
-            # Add many-to-many and one-to-many relationship objects (full details)
-            author_list = database.query(Author).join(books_1, Author.id == books_1.c.authors).filter(books_1.c.books == book_item.id).all()
-            item_dict['authors'] = []
-            for author_obj in author_list:
-                author_dict = author_obj.__dict__.copy()
-                author_dict.pop('_sa_instance_state', None)
-                item_dict['authors'].append(author_dict)
-            library_list = database.query(Library).join(books, Library.id == books.c.library).filter(books.c.books == book_item.id).all()
-            item_dict['library'] = []
-            for library_obj in library_list:
-                library_dict = library_obj.__dict__.copy()
-                library_dict.pop('_sa_instance_state', None)
-                item_dict['library'].append(library_dict)
-            
-            result.append(item_dict)
-        return result
+        # Eagerly load all relationships in batched IN queries to avoid N+1 queries,
+        # and stream the JSON array so memory stays O(batch size) for large tables
+        stmt = (
+            select(Book)
+            .options(selectinload(Book.authors), selectinload(Book.library))
+            .execution_options(yield_per=500)
+        )
+        result = await database.stream(stmt)
+
+        async def generate():
+            yield b"["
+            first = True
+            async for book_item in result.scalars():
+                if not first:
+                    yield b","
+                first = False
+                yield orjson.dumps(BookDetailed.model_validate(book_item).model_dump())
+            yield b"]"
+
+        return StreamingResponse(generate(), media_type="application/json")
     else:
         # Default: return flat entities (faster for charts/widgets without lookup columns)
-        return database.query(Book).all()
+        cache_key = f"book:all:{query_cache.version('book')}"
+        cached = query_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        book_list = (await database.execute(select(Book))).scalars().all()
+        query_cache.set(cache_key, book_list)
+        return book_list
 
 
 @app.get("/book/count/", response_model=None, tags=["Book"])
-def get_count_book(database: Session = Depends(get_db)) -> dict:
+async def get_count_book(database: AsyncSession = Depends(get_db)) -> dict:
     """Get the total count of Book entities"""
-    count = database.query(Book).count()
-    return {"count": count}
+    cache_key = f"book:count:{query_cache.version('book')}"
+    cached = query_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    count = await database.scalar(select(func.count()).select_from(Book))
+    result = {"count": count}
+    query_cache.set(cache_key, result)
+    return result
 
 
 @app.get("/book/paginated/", response_model=None, tags=["Book"])
-def get_paginated_book(skip: int = 0, limit: int = 100, detailed: bool = False, database: Session = Depends(get_db)) -> dict:
+async def get_paginated_book(skip: int = 0, limit: int = 100, detailed: bool = False, include_total: bool = True, database: AsyncSession = Depends(get_db)) -> dict:
     """Get paginated list of Book entities"""
-    total = database.query(Book).count()
-    book_list = database.query(Book).offset(skip).limit(limit).all()
+    # The COUNT is its own round-trip; infinite-scroll clients can pass
+    # include_total=false to skip it
+    total = await database.scalar(select(func.count()).select_from(Book)) if include_total else None
     # By default, return flat entities (for charts/widgets)
     # Use detailed=true to get entities with relationships
     if not detailed:
+        book_list = (await database.execute(select(Book).offset(skip).limit(limit))).scalars().all()
         return {
             "total": total,
             "skip": skip,
             "limit": limit,
             "data": book_list
         }
-    
+
+    # Fetch the page plus both association ID lists in one fused query
+    stmt = (
+        select(Book)
+        .options(selectinload(Book.authors).load_only(Author.id),
+                 selectinload(Book.library).load_only(Library.id))
+        .offset(skip).limit(limit)
+    )
+    book_list = (await database.execute(stmt)).scalars().all()
     result = []
     for book_item in book_list:
-        author_ids = database.query(books_1.c.authors).filter(books_1.c.books == book_item.id).all()
-        library_ids = database.query(books.c.library).filter(books.c.books == book_item.id).all()
         item_data = {
-            "book": book_item,
-            "author_ids": [x[0] for x in author_ids],
-            "library_ids": [x[0] for x in library_ids],
+            "book": BookRead.model_validate(book_item),
+            "author_ids": [author.id for author in book_item.authors],
+            "library_ids": [library.id for library in book_item.library],
         }
         result.append(item_data)
     return {
@@ -294,109 +422,94 @@ def get_paginated_book(skip: int = 0, limit: int = 100, detailed: bool = False,
 
 
 @app.get("/book/search/", response_model=None, tags=["Book"])
-def search_book(
-    database: Session = Depends(get_db)
+async def search_book(
+    database: AsyncSession = Depends(get_db)
 ) -> list:
     """Search Book entities by attributes"""
-    query = database.query(Book)
-    
-    
-    results = query.all()
+    query = select(Book)
+
+
+    results = (await database.execute(query)).scalars().all()
     return results
 
 
-@app.get("/book/{book_id}/", response_model=None, tags=["Book"])
-async def get_book(book_id: int, database: Session = Depends(get_db)) -> Book:
-    db_book = database.query(Book).filter(Book.id == book_id).first()
+@app.get("/book/{book_id}/", response_model=BookResponse, tags=["Book"])
+async def get_book(book_id: int, database: AsyncSession = Depends(get_db)) -> Book:
+    # Load the book and both association ID lists in one fused query
+    db_book = await database.get(
+        Book, book_id,
+        options=(selectinload(Book.authors).load_only(Author.id),
+                 selectinload(Book.library).load_only(Library.id)))
     if db_book is None:
         raise HTTPException(status_code=404, detail="Book not found")
 
-    author_ids = database.query(books_1.c.authors).filter(books_1.c.books == db_book.id).all()
-    library_ids = database.query(books.c.library).filter(books.c.books == db_book.id).all()
     response_data = {
-        "book": db_book,
-        "author_ids": [x[0] for x in author_ids],
-        "library_ids": [x[0] for x in library_ids],
+        "book": BookRead.model_validate(db_book),
+        "author_ids": [author.id for author in db_book.authors],
+        "library_ids": [library.id for library in db_book.library],
 }
     return response_data
 
 
 
-@app.post("/book/", response_model=None, tags=["Book"])
-async def create_book(book_data: BookCreate, database: Session = Depends(get_db)) -> Book:
+@app.post("/book/", response_model=BookResponse, tags=["Book"])
+async def create_book(book_data: BookCreate, database: AsyncSession = Depends(get_db)) -> Book:
 
     if book_data.authors:
-        for id in book_data.authors:
-            # Entity already validated before creation
-            db_author = database.query(Author).filter(Author.id == id).first()
-            if not db_author:
-                raise HTTPException(status_code=404, detail=f"Author with ID {id} not found")
+        # Validate all referenced entities with a single IN query
+        found = set((await database.execute(select(Author.id).where(Author.id.in_(book_data.authors)))).scalars())
+        missing = set(book_data.authors) - found
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Author with ID {sorted(missing)} not found")
     if book_data.library:
-        for id in book_data.library:
-            # Entity already validated before creation
-            db_library = database.query(Library).filter(Library.id == id).first()
-            if not db_library:
-                raise HTTPException(status_code=404, detail=f"Library with ID {id} not found")
+        # Validate all referenced entities with a single IN query
+        found = set((await database.execute(select(Library.id).where(Library.id.in_(book_data.library)))).scalars())
+        missing = set(book_data.library) - found
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Library with ID {sorted(missing)} not found")
 
     db_book = Book(
         pages=book_data.pages,        time=book_data.time,        stock=book_data.stock,        price=book_data.price,        release=book_data.release,        title=book_data.title        )
 
     database.add(db_book)
-    database.commit()
-    database.refresh(db_book)
+    await database.flush()  # Assign the primary key without committing
 
 
+    # Create all associations in one executemany per table, then commit once
     if book_data.authors:
-        for id in book_data.authors:
-            # Entity already validated before creation
-            db_author = database.query(Author).filter(Author.id == id).first()
-            # Create the association
-            association = books_1.insert().values(books=db_book.id, authors=db_author.id)
-            database.execute(association)
-            database.commit()
+        await database.execute(books_1.insert(), [{"books": db_book.id, "authors": author_id} for author_id in book_data.authors])
     if book_data.library:
-        for id in book_data.library:
-            # Entity already validated before creation
-            db_library = database.query(Library).filter(Library.id == id).first()
-            # Create the association
-            association = books.insert().values(books=db_book.id, library=db_library.id)
-            database.execute(association)
-            database.commit()
-
-    
-    author_ids = database.query(books_1.c.authors).filter(books_1.c.books == db_book.id).all()
-    library_ids = database.query(books.c.library).filter(books.c.books == db_book.id).all()
+        await database.execute(books.insert(), [{"books": db_book.id, "library": library_id} for library_id in book_data.library])
+    await database.commit()
+    await database.refresh(db_book)
+    query_cache.invalidate("book")
+
+
+    # The association IDs were validated above; no need to re-query them
     response_data = {
         "book": db_book,
-        "author_ids": [x[0] for x in author_ids],
-        "library_ids": [x[0] for x in library_ids],
+        "author_ids": list(book_data.authors),
+        "library_ids": list(book_data.library),
     }
     return response_data
 
 
 @app.post("/book/bulk/", response_model=None, tags=["Book"])
-async def bulk_create_book(items: list[BookCreate], database: Session = Depends(get_db)) -> dict:
+async def bulk_create_book(items: list[BookCreate], database: AsyncSession = Depends(get_db)) -> dict:
     """Create multiple Book entities at once"""
+    # Core executemany INSERT in fixed-size batches; one transaction overall
     created_items = []
-    errors = []
-    
-    for idx, item_data in enumerate(items):
-        try:
-            # Basic validation for each item
-            
-            db_book = Book(
-                pages=item_data.pages,                time=item_data.time,                stock=item_data.stock,                price=item_data.price,                release=item_data.release,                title=item_data.title            )
-            database.add(db_book)
-            database.flush()  # Get ID without committing
-            created_items.append(db_book.id)
-        except Exception as e:
-            errors.append({"index": idx, "error": str(e)})
-    
-    if errors:
-        database.rollback()
-        raise HTTPException(status_code=400, detail={"message": "Bulk creation failed", "errors": errors})
-    
-    database.commit()
+    it = iter(items)
+    while chunk := list(itertools.islice(it, BULK_INSERT_BATCH_SIZE)):
+        chunk_rows = [{
+            "pages": item_data.pages, "time": item_data.time, "stock": item_data.stock,
+            "price": item_data.price, "release": item_data.release, "title": item_data.title,
+        } for item_data in chunk]
+        result = await database.execute(insert(Book).returning(Book.id), chunk_rows)
+        created_items.extend(r[0] for r in result)
+
+    await database.commit()
+    query_cache.invalidate("book")
     return {
         "created_count": len(created_items),
         "created_ids": created_items,
@@ -405,30 +518,31 @@ async def bulk_create_book(items: list[BookCreate], database: Session = Depends(
 
 
 @app.delete("/book/bulk/", response_model=None, tags=["Book"])
-async def bulk_delete_book(ids: list[int], database: Session = Depends(get_db)) -> dict:
+async def bulk_delete_book(ids: list[int], database: AsyncSession = Depends(get_db)) -> dict:
     """Delete multiple Book entities at once"""
-    deleted_count = 0
-    not_found = []
-    
-    for item_id in ids:
-        db_book = database.query(Book).filter(Book.id == item_id).first()
-        if db_book:
-            database.delete(db_book)
-            deleted_count += 1
-        else:
-            not_found.append(item_id)
-    
-    database.commit()
-    
+    # One existence query + one set-based DELETE instead of 2N statements
+    found = set((await database.execute(select(Book.id).where(Book.id.in_(ids)))).scalars())
+    not_found = [item_id for item_id in ids if item_id not in found]
+
+    if found:
+        # Clean up association rows explicitly; set-based DELETE bypasses ORM cascades
+        await database.execute(books_1.delete().where(books_1.c.books.in_(found)))
+        await database.execute(books.delete().where(books.c.books.in_(found)))
+        await database.execute(delete(Book).where(Book.id.in_(found)))
+    deleted_count = len(found)
+
+    await database.commit()
+    query_cache.invalidate("book")
+
     return {
         "deleted_count": deleted_count,
         "not_found": not_found,
         "message": f"Successfully deleted {deleted_count} Book entities"
     }
 
-@app.put("/book/{book_id}/", response_model=None, tags=["Book"])
-async def update_book(book_id: int, book_data: BookCreate, database: Session = Depends(get_db)) -> Book:
-    db_book = database.query(Book).filter(Book.id == book_id).first()
+@app.put("/book/{book_id}/", response_model=BookResponse, tags=["Book"])
+async def update_book(book_id: int, book_data: BookCreate, database: AsyncSession = Depends(get_db)) -> Book:
+    db_book = await database.get(Book, book_id)
     if db_book is None:
         raise HTTPException(status_code=404, detail="Book not found")
 
@@ -438,125 +552,118 @@ async def update_book(book_id: int, book_data: BookCreate, database: Session = D
     setattr(db_book, 'price', book_data.price)
     setattr(db_book, 'release', book_data.release)
     setattr(db_book, 'title', book_data.title)
-    existing_author_ids = [assoc.authors for assoc in database.execute(
+    existing_author_ids = [assoc.authors for assoc in await database.execute(
         books_1.select().where(books_1.c.books == db_book.id))]
-    
+
     authors_to_remove = set(existing_author_ids) - set(book_data.authors)
-    for author_id in authors_to_remove:
-        association = books_1.delete().where(
-            (books_1.c.books == db_book.id) & (books_1.c.authors == author_id))
-        database.execute(association)
+    if authors_to_remove:
+        await database.execute(books_1.delete().where(
+            (books_1.c.books == db_book.id) & (books_1.c.authors.in_(authors_to_remove))))
 
     new_author_ids = set(book_data.authors) - set(existing_author_ids)
-    for author_id in new_author_ids:
-        db_author = database.query(Author).filter(Author.id == author_id).first()
-        if db_author is None:
-            raise HTTPException(status_code=404, detail=f"Author with ID {author_id} not found")
-        association = books_1.insert().values(authors=db_author.id, books=db_book.id)
-        database.execute(association)
-    existing_library_ids = [assoc.library for assoc in database.execute(
+    if new_author_ids:
+        found = set((await database.execute(select(Author.id).where(Author.id.in_(new_author_ids)))).scalars())
+        missing = new_author_ids - found
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Author with ID {sorted(missing)} not found")
+        await database.execute(books_1.insert(), [{"authors": author_id, "books": db_book.id} for author_id in new_author_ids])
+    existing_library_ids = [assoc.library for assoc in await database.execute(
         books.select().where(books.c.books == db_book.id))]
-    
+
     librarys_to_remove = set(existing_library_ids) - set(book_data.library)
-    for library_id in librarys_to_remove:
-        association = books.delete().where(
-            (books.c.books == db_book.id) & (books.c.library == library_id))
-        database.execute(association)
+    if librarys_to_remove:
+        await database.execute(books.delete().where(
+            (books.c.books == db_book.id) & (books.c.library.in_(librarys_to_remove))))
 
     new_library_ids = set(book_data.library) - set(existing_library_ids)
-    for library_id in new_library_ids:
-        db_library = database.query(Library).filter(Library.id == library_id).first()
-        if db_library is None:
-            raise HTTPException(status_code=404, detail=f"Library with ID {library_id} not found")
-        association = books.insert().values(library=db_library.id, books=db_book.id)
-        database.execute(association)
-    database.commit()
-    database.refresh(db_book)
-    
-    author_ids = database.query(books_1.c.authors).filter(books_1.c.books == db_book.id).all()
-    library_ids = database.query(books.c.library).filter(books.c.books == db_book.id).all()
+    if new_library_ids:
+        found = set((await database.execute(select(Library.id).where(Library.id.in_(new_library_ids)))).scalars())
+        missing = new_library_ids - found
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Library with ID {sorted(missing)} not found")
+        await database.execute(books.insert(), [{"library": library_id, "books": db_book.id} for library_id in new_library_ids])
+    await database.commit()
+    await database.refresh(db_book)
+    query_cache.invalidate("book")
+
+    # The associations now match the validated request payload exactly
     response_data = {
         "book": db_book,
-        "author_ids": [x[0] for x in author_ids],
-        "library_ids": [x[0] for x in library_ids],
+        "author_ids": list(book_data.authors),
+        "library_ids": list(book_data.library),
     }
     return response_data
 
 
 @app.delete("/book/{book_id}/", response_model=None, tags=["Book"])
-async def delete_book(book_id: int, database: Session = Depends(get_db)):
-    db_book = database.query(Book).filter(Book.id == book_id).first()
+async def delete_book(book_id: int, database: AsyncSession = Depends(get_db)):
+    db_book = await database.get(
+        Book, book_id, options=(selectinload(Book.authors), selectinload(Book.library)))
     if db_book is None:
         raise HTTPException(status_code=404, detail="Book not found")
-    database.delete(db_book)
-    database.commit()
-    return db_book
+    await database.delete(db_book)
+    await database.commit()
+    query_cache.invalidate("book")
+    # 204: nothing to serialize, and the instance is already detached
+    return Response(status_code=204)
 
 @app.post("/book/{book_id}/authors/{author_id}/", response_model=None, tags=["Book Relationships"])
-async def add_authors_to_book(book_id: int, author_id: int, database: Session = Depends(get_db)):
+async def add_authors_to_book(book_id: int, author_id: int, database: AsyncSession = Depends(get_db)):
     """Add a Author to this Book's authors relationship"""
-    db_book = database.query(Book).filter(Book.id == book_id).first()
+    db_book = await database.get(Book, book_id)
     if db_book is None:
         raise HTTPException(status_code=404, detail="Book not found")
-    
-    db_author = database.query(Author).filter(Author.id == author_id).first()
+
+    db_author = await database.get(Author, author_id)
     if db_author is None:
         raise HTTPException(status_code=404, detail="Author not found")
-    
-    # Check if relationship already exists
-    existing = database.query(books_1).filter(
-        (books_1.c.books == book_id) & 
-        (books_1.c.authors == author_id)
-    ).first()
-    
-    if existing:
+
+    # Create the association; ON CONFLICT DO NOTHING folds the existence
+    # check into the insert and is race-free under concurrent requests
+    result = await database.execute(
+        INSERT_BOOK_AUTHOR_ASSOC, {"book_id": book_id, "author_id": author_id})
+    await database.commit()
+
+    if result.rowcount == 0:
         raise HTTPException(status_code=400, detail="Relationship already exists")
-    
-    # Create the association
-    association = books_1.insert().values(books=book_id, authors=author_id)
-    database.execute(association)
-    database.commit()
-    
+
     return {"message": "Author added to authors successfully"}
 
 
 @app.delete("/book/{book_id}/authors/{author_id}/", response_model=None, tags=["Book Relationships"])
-async def remove_authors_from_book(book_id: int, author_id: int, database: Session = Depends(get_db)):
+async def remove_authors_from_book(book_id: int, author_id: int, database: AsyncSession = Depends(get_db)):
     """Remove a Author from this Book's authors relationship"""
-    db_book = database.query(Book).filter(Book.id == book_id).first()
+    db_book = await database.get(Book, book_id)
     if db_book is None:
         raise HTTPException(status_code=404, detail="Book not found")
-    
+
     # Check if relationship exists
-    existing = database.query(books_1).filter(
-        (books_1.c.books == book_id) & 
-        (books_1.c.authors == author_id)
-    ).first()
-    
+    existing = (await database.execute(
+        BOOK_AUTHOR_ASSOC_EXISTS, {"book_id": book_id, "author_id": author_id})).first()
+
     if not existing:
         raise HTTPException(status_code=404, detail="Relationship not found")
-    
+
     # Delete the association
-    association = books_1.delete().where(
-        (books_1.c.books == book_id) & 
-        (books_1.c.authors == author_id)
-    )
-    database.execute(association)
-    database.commit()
-    
-    return {"message": "Author removed from authors successfully"}
+    await database.execute(
+        DELETE_BOOK_AUTHOR_ASSOC, {"book_id": book_id, "author_id": author_id})
+    await database.commit()
+
+    return Response(status_code=204)
 
 
 @app.get("/book/{book_id}/authors/", response_model=None, tags=["Book Relationships"])
-async def get_authors_of_book(book_id: int, database: Session = Depends(get_db)):
+async def get_authors_of_book(book_id: int, database: AsyncSession = Depends(get_db)):
     """Get all Author entities related to this Book through authors"""
-    db_book = database.query(Book).filter(Book.id == book_id).first()
-    if db_book is None:
-        raise HTTPException(status_code=404, detail="Book not found")
-    
-    author_ids = database.query(books_1.c.authors).filter(books_1.c.books == book_id).all()
-    author_list = database.query(Author).filter(Author.id.in_([id[0] for id in author_ids])).all()
-    
+    # Single join replaces the two-step ID fetch + IN query
+    author_list = (await database.execute(
+        select(Author).join(books_1, Author.id == books_1.c.authors).where(books_1.c.books == book_id)
+    )).scalars().all()
+    if not author_list:
+        # Only verify the book exists when the join came back empty
+        if await database.scalar(select(Book.id).where(Book.id == book_id)) is None:
+            raise HTTPException(status_code=404, detail="Book not found")
+
     return {
         "book_id": book_id,
         "authors_count": len(author_list),
@@ -564,70 +671,62 @@ async def get_authors_of_book(book_id: int, database: Session = Depends(get_db))
     }
 
 @app.post("/book/{book_id}/library/{library_id}/", response_model=None, tags=["Book Relationships"])
-async def add_library_to_book(book_id: int, library_id: int, database: Session = Depends(get_db)):
+async def add_library_to_book(book_id: int, library_id: int, database: AsyncSession = Depends(get_db)):
     """Add a Library to this Book's library relationship"""
-    db_book = database.query(Book).filter(Book.id == book_id).first()
+    db_book = await database.get(Book, book_id)
     if db_book is None:
         raise HTTPException(status_code=404, detail="Book not found")
-    
-    db_library = database.query(Library).filter(Library.id == library_id).first()
+
+    db_library = await database.get(Library, library_id)
     if db_library is None:
         raise HTTPException(status_code=404, detail="Library not found")
-    
-    # Check if relationship already exists
-    existing = database.query(books).filter(
-        (books.c.books == book_id) & 
-        (books.c.library == library_id)
-    ).first()
-    
-    if existing:
+
+    # Create the association; ON CONFLICT DO NOTHING folds the existence
+    # check into the insert and is race-free under concurrent requests
+    result = await database.execute(
+        INSERT_BOOK_LIBRARY_ASSOC, {"book_id": book_id, "library_id": library_id})
+    await database.commit()
+
+    if result.rowcount == 0:
         raise HTTPException(status_code=400, detail="Relationship already exists")
-    
-    # Create the association
-    association = books.insert().values(books=book_id, library=library_id)
-    database.execute(association)
-    database.commit()
-    
+
     return {"message": "Library added to library successfully"}
 
 
 @app.delete("/book/{book_id}/library/{library_id}/", response_model=None, tags=["Book Relationships"])
-async def remove_library_from_book(book_id: int, library_id: int, database: Session = Depends(get_db)):
+async def remove_library_from_book(book_id: int, library_id: int, database: AsyncSession = Depends(get_db)):
     """Remove a Library from this Book's library relationship"""
-    db_book = database.query(Book).filter(Book.id == book_id).first()
+    db_book = await database.get(Book, book_id)
     if db_book is None:
         raise HTTPException(status_code=404, detail="Book not found")
-    
+
     # Check if relationship exists
-    existing = database.query(books).filter(
-        (books.c.books == book_id) & 
-        (books.c.library == library_id)
-    ).first()
-    
+    existing = (await database.execute(
+        BOOK_LIBRARY_ASSOC_EXISTS, {"book_id": book_id, "library_id": library_id})).first()
+
     if not existing:
         raise HTTPException(status_code=404, detail="Relationship not found")
-    
+
     # Delete the association
-    association = books.delete().where(
-        (books.c.books == book_id) & 
-        (books.c.library == library_id)
-    )
-    database.execute(association)
-    database.commit()
-    
-    return {"message": "Library removed from library successfully"}
+    await database.execute(
+        DELETE_BOOK_LIBRARY_ASSOC, {"book_id": book_id, "library_id": library_id})
+    await database.commit()
+
+    return Response(status_code=204)
 
 
 @app.get("/book/{book_id}/library/", response_model=None, tags=["Book Relationships"])
-async def get_library_of_book(book_id: int, database: Session = Depends(get_db)):
+async def get_library_of_book(book_id: int, database: AsyncSession = Depends(get_db)):
     """Get all Library entities related to this Book through library"""
-    db_book = database.query(Book).filter(Book.id == book_id).first()
-    if db_book is None:
-        raise HTTPException(status_code=404, detail="Book not found")
-    
-    library_ids = database.query(books.c.library).filter(books.c.books == book_id).all()
-    library_list = database.query(Library).filter(Library.id.in_([id[0] for id in library_ids])).all()
-    
+    # Single join replaces the two-step ID fetch + IN query
+    library_list = (await database.execute(
+        select(Library).join(books, Library.id == books.c.library).where(books.c.books == book_id)
+    )).scalars().all()
+    if not library_list:
+        # Only verify the book exists when the join came back empty
+        if await database.scalar(select(Book.id).where(Book.id == book_id)) is None:
+            raise HTTPException(status_code=404, detail="Book not found")
+
     return {
         "book_id": book_id,
         "library_count": len(library_list),
@@ -645,67 +744,50 @@ async def get_library_of_book(book_id: int, database: Session = Depends(get_db))
 async def execute_book_decrease_stock(
     book_id: int,
     params: dict = Body(default=None, embed=True),
-    database: Session = Depends(get_db)
+    database: AsyncSession = Depends(get_db)
 ):
     """
     Execute the decrease_stock method on a Book instance.
-    
+
     Parameters:
     - qty: int    """
-    # Retrieve the entity from the database
-    _book_object = database.query(Book).filter(Book.id == book_id).first()
-    if _book_object is None:
-        raise HTTPException(status_code=404, detail="Book not found")
-    
-    # Prepare method parameters
-    qty = params.get('qty')
-
-    # Execute the method
-    try:        
-        # Capture stdout to include print outputs in the response
-        import io
-        import sys
-        captured_output = io.StringIO()
-        sys.stdout = captured_output
-
-        """
-        Decrease the available stock by the given quantity.
-
-        :param qty: Number of items to remove from stock
-        :raises ValueError: If qty is negative or exceeds available stock
-        """
-        if qty <= 0:
-            raise ValueError("Quantity must be a positive integer")
-
-        if qty > _book_object.stock:
-            raise ValueError(
-                f"Cannot decrease stock by {qty}. Only {_book_object.stock} items available."
-            )
-
-        _book_object.stock -= qty
+    # Prepare method parameters (the params body itself is optional)
+    qty = (params or {}).get('qty')
 
+    """
+    Decrease the available stock by the given quantity.
 
-        # Commit DB
-        database.commit()
-        database.refresh(_book_object)
+    :param qty: Number of items to remove from stock
+    :raises ValueError: If qty is negative or exceeds available stock
+    """
+    if qty is None or qty <= 0:
+        raise ValueError("Quantity must be a positive integer")
+
+    # Single atomic UPDATE: the stock check and decrement happen in one
+    # statement, so concurrent requests cannot race past the guard
+    res = await database.execute(
+        update(Book)
+        .where(Book.id == book_id, Book.stock >= qty)
+        .values(stock=Book.stock - qty)
+        .returning(Book.stock)
+    )
+    row = res.first()
+    if row is None:
+        # Distinguish a missing book from insufficient stock
+        exists = await database.scalar(select(Book.id).where(Book.id == book_id))
+        if exists is None:
+            raise HTTPException(status_code=404, detail="Book not found")
+        raise HTTPException(status_code=409, detail="Insufficient stock")
+    await database.commit()
+    query_cache.invalidate("book")
 
-        # Restore stdout
-        sys.stdout = sys.__stdout__
-        output = captured_output.getvalue()
-        
-        # Determine result (last statement or None)
-        result = None
-        
-        return {
-            "book_id": book_id,
-            "method": "decrease_stock",
-            "status": "executed",
-            "result": str(result) if result is not None else None,
-            "output": output if output else None
-        }
-    except Exception as e:
-        sys.stdout = sys.__stdout__
-        raise HTTPException(status_code=500, detail=f"Method execution failed: {str(e)}")
+    return {
+        "book_id": book_id,
+        "method": "decrease_stock",
+        "status": "executed",
+        "result": None,
+        "output": None
+    }
 
 
 
@@ -714,70 +796,78 @@ async def execute_book_decrease_stock(
 #   Author functions
 #
 ############################################
- 
- 
+
+
 
 @app.get("/author/", response_model=None, tags=["Author"])
-def get_all_author(detailed: bool = False, database: Session = Depends(get_db)) -> list:
-    from sqlalchemy.orm import joinedload
-    
+async def get_all_author(detailed: bool = False, database: AsyncSession = Depends(get_db)) -> list:
     # Use detailed=true to get entities with eagerly loaded relationships (for tables with lookup columns)
     if detailed:
-        # Eagerly load all relationships to avoid N+1 queries
-        query = database.query(Author)
-        author_list = query.all()
-        
-        # Serialize with relationships included
-        result = []
-        for author_item in author_list:
-            item_dict = author_item.__dict__.copy()
-            item_dict.pop('_sa_instance_state', None)
-            
-            # Add many-to-one relationships (foreign keys for lookup columns)
-            
-            # Add many-to-many and one-to-many relationship objects (full details)
-            book_list = database.query(Book).join(books_1, Book.id == books_1.c.books).filter(books_1.c.authors == author_item.id).all()
-            item_dict['books'] = []
-            for book_obj in book_list:
-                book_dict = book_obj.__dict__.copy()
-                book_dict.pop('_sa_instance_state', None)
-                item_dict['books'].append(book_dict)
-            
-            result.append(item_dict)
-        return result
+        # Eagerly load all relationships in one batched IN query to avoid N+1 queries,
+        # and stream the JSON array so memory stays O(batch size) for large tables
+        stmt = (
+            select(Author)
+            .options(selectinload(Author.books))
+            .execution_options(yield_per=500)
+        )
+        result = await database.stream(stmt)
+
+        async def generate():
+            yield b"["
+            first = True
+            async for author_item in result.scalars():
+                if not first:
+                    yield b","
+                first = False
+                yield orjson.dumps(AuthorDetailed.model_validate(author_item).model_dump())
+            yield b"]"
+
+        return StreamingResponse(generate(), media_type="application/json")
     else:
         # Default: return flat entities (faster for charts/widgets without lookup columns)
-        return database.query(Author).all()
+        return (await database.execute(select(Author))).scalars().all()
 
 
 @app.get("/author/count/", response_model=None, tags=["Author"])
-def get_count_author(database: Session = Depends(get_db)) -> dict:
+async def get_count_author(database: AsyncSession = Depends(get_db)) -> dict:
     """Get the total count of Author entities"""
-    count = database.query(Author).count()
-    return {"count": count}
+    cache_key = f"author:count:{query_cache.version('author')}"
+    cached = query_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    count = await database.scalar(select(func.count()).select_from(Author))
+    result = {"count": count}
+    query_cache.set(cache_key, result)
+    return result
 
 
 @app.get("/author/paginated/", response_model=None, tags=["Author"])
-def get_paginated_author(skip: int = 0, limit: int = 100, detailed: bool = False, database: Session = Depends(get_db)) -> dict:
+async def get_paginated_author(skip: int = 0, limit: int = 100, detailed: bool = False, include_total: bool = True, database: AsyncSession = Depends(get_db)) -> dict:
     """Get paginated list of Author entities"""
-    total = database.query(Author).count()
-    author_list = database.query(Author).offset(skip).limit(limit).all()
+    # The COUNT is its own round-trip; infinite-scroll clients can pass
+    # include_total=false to skip it
+    total = await database.scalar(select(func.count()).select_from(Author)) if include_total else None
     # By default, return flat entities (for charts/widgets)
     # Use detailed=true to get entities with relationships
     if not detailed:
+        author_list = (await database.execute(select(Author).offset(skip).limit(limit))).scalars().all()
         return {
             "total": total,
             "skip": skip,
             "limit": limit,
             "data": author_list
         }
-    
+
+    # Fetch the page and its related IDs in one query instead of 1+N
+    author_list = (await database.execute(
+        select(Author).options(selectinload(Author.books).load_only(Book.id))
+        .offset(skip).limit(limit)
+    )).scalars().all()
     result = []
     for author_item in author_list:
-        book_ids = database.query(books_1.c.books).filter(books_1.c.authors == author_item.id).all()
         item_data = {
-            "author": author_item,
-            "book_ids": [x[0] for x in book_ids],
+            "author": AuthorRead.model_validate(author_item),
+            "book_ids": [book.id for book in author_item.books],
         }
         result.append(item_data)
     return {
@@ -789,24 +879,24 @@ def get_paginated_author(skip: int = 0, limit: int = 100, detailed: bool = False
 
 
 @app.get("/author/search/", response_model=None, tags=["Author"])
-def search_author(
-    database: Session = Depends(get_db)
+async def search_author(
+    database: AsyncSession = Depends(get_db)
 ) -> list:
     """Search Author entities by attributes"""
-    query = database.query(Author)
-    
-    
-    results = query.all()
+    query = select(Author)
+
+
+    results = (await database.execute(query)).scalars().all()
     return results
 
 
-@app.get("/author/{author_id}/", response_model=None, tags=["Author"])
-async def get_author(author_id: int, database: Session = Depends(get_db)) -> Author:
-    db_author = database.query(Author).filter(Author.id == author_id).first()
+@app.get("/author/{author_id}/", response_model=AuthorResponse, tags=["Author"])
+async def get_author(author_id: int, database: AsyncSession = Depends(get_db)) -> Author:
+    db_author = await database.get(Author, author_id)
     if db_author is None:
         raise HTTPException(status_code=404, detail="Author not found")
 
-    book_ids = database.query(books_1.c.books).filter(books_1.c.authors == db_author.id).all()
+    book_ids = (await database.execute(BOOK_IDS_BY_AUTHOR, {"author_id": db_author.id})).all()
     response_data = {
         "author": db_author,
         "book_ids": [x[0] for x in book_ids],
@@ -815,37 +905,36 @@ async def get_author(author_id: int, database: Session = Depends(get_db)) -> Aut
 
 
 
-@app.post("/author/", response_model=None, tags=["Author"])
-async def create_author(author_data: AuthorCreate, database: Session = Depends(get_db)) -> Author:
+@app.post("/author/", response_model=AuthorResponse, tags=["Author"])
+async def create_author(author_data: AuthorCreate, database: AsyncSession = Depends(get_db)) -> Author:
 
     if not author_data.books or len(author_data.books) < 1:
         raise HTTPException(status_code=400, detail="At least 1 Book(s) required")
     if author_data.books:
-        for id in author_data.books:
-            # Entity already validated before creation
-            db_book = database.query(Book).filter(Book.id == id).first()
-            if not db_book:
-                raise HTTPException(status_code=404, detail=f"Book with ID {id} not found")
+        # Validate all referenced entities with a single IN query
+        found = set((await database.execute(select(Book.id).where(Book.id.in_(author_data.books)))).scalars())
+        missing = set(author_data.books) - found
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Book with ID {sorted(missing)} not found")
 
     db_author = Author(
         name=author_data.name        )
 
     database.add(db_author)
-    database.commit()
-    database.refresh(db_author)
-
+    await database.flush()  # Assign db_author.id without committing
 
     if author_data.books:
-        for id in author_data.books:
-            # Entity already validated before creation
-            db_book = database.query(Book).filter(Book.id == id).first()
-            # Create the association
-            association = books_1.insert().values(authors=db_author.id, books=db_book.id)
-            database.execute(association)
-            database.commit()
-
-    
-    book_ids = database.query(books_1.c.books).filter(books_1.c.authors == db_author.id).all()
+        # executemany: one INSERT round-trip for all association rows
+        await database.execute(
+            books_1.insert(),
+            [{"authors": db_author.id, "books": id} for id in author_data.books],
+        )
+    await database.commit()
+    # No refresh needed: the flush assigned the PK and expire_on_commit=False
+    # keeps the instance's attributes loaded after commit
+
+    query_cache.invalidate("author")
+    book_ids = (await database.execute(BOOK_IDS_BY_AUTHOR, {"author_id": db_author.id})).all()
     response_data = {
         "author": db_author,
         "book_ids": [x[0] for x in book_ids],
@@ -854,28 +943,18 @@ async def create_author(author_data: AuthorCreate, database: Session = Depends(g
 
 
 @app.post("/author/bulk/", response_model=None, tags=["Author"])
-async def bulk_create_author(items: list[AuthorCreate], database: Session = Depends(get_db)) -> dict:
+async def bulk_create_author(items: list[AuthorCreate], database: AsyncSession = Depends(get_db)) -> dict:
     """Create multiple Author entities at once"""
+    # Core executemany INSERT in fixed-size batches; one transaction overall
     created_items = []
-    errors = []
-    
-    for idx, item_data in enumerate(items):
-        try:
-            # Basic validation for each item
-            
-            db_author = Author(
-                name=item_data.name            )
-            database.add(db_author)
-            database.flush()  # Get ID without committing
-            created_items.append(db_author.id)
-        except Exception as e:
-            errors.append({"index": idx, "error": str(e)})
-    
-    if errors:
-        database.rollback()
-        raise HTTPException(status_code=400, detail={"message": "Bulk creation failed", "errors": errors})
-    
-    database.commit()
+    it = iter(items)
+    while chunk := list(itertools.islice(it, BULK_INSERT_BATCH_SIZE)):
+        chunk_rows = [{"name": item_data.name} for item_data in chunk]
+        result = await database.execute(insert(Author).returning(Author.id), chunk_rows)
+        created_items.extend(r[0] for r in result)
+
+    await database.commit()
+    query_cache.invalidate("author")
     return {
         "created_count": len(created_items),
         "created_ids": created_items,
@@ -884,54 +963,64 @@ async def bulk_create_author(items: list[AuthorCreate], database: Session = Depe
 
 
 @app.delete("/author/bulk/", response_model=None, tags=["Author"])
-async def bulk_delete_author(ids: list[int], database: Session = Depends(get_db)) -> dict:
+async def bulk_delete_author(ids: list[int], database: AsyncSession = Depends(get_db)) -> dict:
     """Delete multiple Author entities at once"""
-    deleted_count = 0
-    not_found = []
-    
-    for item_id in ids:
-        db_author = database.query(Author).filter(Author.id == item_id).first()
-        if db_author:
-            database.delete(db_author)
-            deleted_count += 1
-        else:
-            not_found.append(item_id)
-    
-    database.commit()
-    
+    # One existence query + one set-based DELETE instead of 2N statements
+    found = set((await database.execute(select(Author.id).where(Author.id.in_(ids)))).scalars())
+    not_found = [item_id for item_id in ids if item_id not in found]
+
+    if found:
+        # Clean up association rows explicitly; set-based DELETE bypasses ORM cascades
+        await database.execute(books_1.delete().where(books_1.c.authors.in_(found)))
+        await database.execute(delete(Author).where(Author.id.in_(found)))
+    deleted_count = len(found)
+
+    await database.commit()
+    query_cache.invalidate("author")
+
     return {
         "deleted_count": deleted_count,
         "not_found": not_found,
         "message": f"Successfully deleted {deleted_count} Author entities"
     }
 
-@app.put("/author/{author_id}/", response_model=None, tags=["Author"])
-async def update_author(author_id: int, author_data: AuthorCreate, database: Session = Depends(get_db)) -> Author:
-    db_author = database.query(Author).filter(Author.id == author_id).first()
+@app.put("/author/{author_id}/", response_model=AuthorResponse, tags=["Author"])
+async def update_author(author_id: int, author_data: AuthorCreate, database: AsyncSession = Depends(get_db)) -> Author:
+    db_author = await database.get(Author, author_id)
     if db_author is None:
         raise HTTPException(status_code=404, detail="Author not found")
 
-    setattr(db_author, 'name', author_data.name)
-    existing_book_ids = [assoc.books for assoc in database.execute(
-        books_1.select().where(books_1.c.authors == db_author.id))]
-    
-    books_to_remove = set(existing_book_ids) - set(author_data.books)
-    for book_id in books_to_remove:
-        association = books_1.delete().where(
-            (books_1.c.authors == db_author.id) & (books_1.c.books == book_id))
-        database.execute(association)
-
-    new_book_ids = set(author_data.books) - set(existing_book_ids)
-    for book_id in new_book_ids:
-        db_book = database.query(Book).filter(Book.id == book_id).first()
-        if db_book is None:
-            raise HTTPException(status_code=404, detail=f"Book with ID {book_id} not found")
-        association = books_1.insert().values(books=db_book.id, authors=db_author.id)
-        database.execute(association)
-    database.commit()
-    database.refresh(db_author)
-    
-    book_ids = database.query(books_1.c.books).filter(books_1.c.authors == db_author.id).all()
+    # Only mark the attribute dirty when it actually changed; an unconditional
+    # setattr would make the flush emit an UPDATE on rename-free requests
+    if db_author.name != author_data.name:
+        setattr(db_author, 'name', author_data.name)
+    existing_book_ids = {assoc.books for assoc in await database.execute(
+        books_1.select().where(books_1.c.authors == db_author.id))}
+
+    requested_book_ids = set(author_data.books)
+    if requested_book_ids != existing_book_ids:
+        books_to_remove = existing_book_ids - requested_book_ids
+        if books_to_remove:
+            await database.execute(books_1.delete().where(
+                (books_1.c.authors == db_author.id) & (books_1.c.books.in_(books_to_remove))))
+
+        new_book_ids = requested_book_ids - existing_book_ids
+        if new_book_ids:
+            # Validate all referenced entities with a single IN query
+            found = set((await database.execute(select(Book.id).where(Book.id.in_(new_book_ids)))).scalars())
+            missing = new_book_ids - found
+            if missing:
+                raise HTTPException(status_code=404, detail=f"Book with ID {sorted(missing)} not found")
+            # executemany: one INSERT round-trip for all association rows
+            await database.execute(
+                books_1.insert(),
+                [{"authors": db_author.id, "books": book_id} for book_id in new_book_ids],
+            )
+    await database.commit()
+    await database.refresh(db_author)
+    query_cache.invalidate("author")
+
+    book_ids = (await database.execute(BOOK_IDS_BY_AUTHOR, {"author_id": db_author.id})).all()
     response_data = {
         "author": db_author,
         "book_ids": [x[0] for x in book_ids],
@@ -940,79 +1029,77 @@ async def update_author(author_id: int, author_data: AuthorCreate, database: Ses
 
 
 @app.delete("/author/{author_id}/", response_model=None, tags=["Author"])
-async def delete_author(author_id: int, database: Session = Depends(get_db)):
-    db_author = database.query(Author).filter(Author.id == author_id).first()
+async def delete_author(author_id: int, database: AsyncSession = Depends(get_db)):
+    db_author = (await database.execute(
+        select(Author).options(selectinload(Author.books)).where(Author.id == author_id)
+    )).scalar_one_or_none()
     if db_author is None:
         raise HTTPException(status_code=404, detail="Author not found")
-    database.delete(db_author)
-    database.commit()
-    return db_author
+    await database.delete(db_author)
+    await database.commit()
+    query_cache.invalidate("author")
+    # 204: nothing to serialize, and the instance is already detached
+    return Response(status_code=204)
 
 @app.post("/author/{author_id}/books/{book_id}/", response_model=None, tags=["Author Relationships"])
-async def add_books_to_author(author_id: int, book_id: int, database: Session = Depends(get_db)):
+async def add_books_to_author(author_id: int, book_id: int, database: AsyncSession = Depends(get_db)):
     """Add a Book to this Author's books relationship"""
-    db_author = database.query(Author).filter(Author.id == author_id).first()
-    if db_author is None:
+    # One round-trip for all three checks instead of three serial SELECTs
+    flags = (await database.execute(select(
+        exists().where(Author.id == author_id).label("author_exists"),
+        exists().where(Book.id == book_id).label("book_exists"),
+    ))).one()
+    if not flags.author_exists:
         raise HTTPException(status_code=404, detail="Author not found")
-    
-    db_book = database.query(Book).filter(Book.id == book_id).first()
-    if db_book is None:
+    if not flags.book_exists:
         raise HTTPException(status_code=404, detail="Book not found")
-    
-    # Check if relationship already exists
-    existing = database.query(books_1).filter(
-        (books_1.c.authors == author_id) & 
-        (books_1.c.books == book_id)
-    ).first()
-    
-    if existing:
+
+    # Create the association; ON CONFLICT DO NOTHING folds the existence
+    # check into the insert and is race-free under concurrent requests
+    result = await database.execute(
+        INSERT_BOOK_AUTHOR_ASSOC, {"book_id": book_id, "author_id": author_id})
+    await database.commit()
+
+    if result.rowcount == 0:
         raise HTTPException(status_code=400, detail="Relationship already exists")
-    
-    # Create the association
-    association = books_1.insert().values(authors=author_id, books=book_id)
-    database.execute(association)
-    database.commit()
-    
+
     return {"message": "Book added to books successfully"}
 
 
 @app.delete("/author/{author_id}/books/{book_id}/", response_model=None, tags=["Author Relationships"])
-async def remove_books_from_author(author_id: int, book_id: int, database: Session = Depends(get_db)):
+async def remove_books_from_author(author_id: int, book_id: int, database: AsyncSession = Depends(get_db)):
     """Remove a Book from this Author's books relationship"""
-    db_author = database.query(Author).filter(Author.id == author_id).first()
+    db_author = await database.get(Author, author_id)
     if db_author is None:
         raise HTTPException(status_code=404, detail="Author not found")
-    
+
     # Check if relationship exists
-    existing = database.query(books_1).filter(
-        (books_1.c.authors == author_id) & 
-        (books_1.c.books == book_id)
-    ).first()
-    
+    existing = (await database.execute(
+        BOOK_AUTHOR_ASSOC_EXISTS, {"book_id": book_id, "author_id": author_id})).first()
+
     if not existing:
         raise HTTPException(status_code=404, detail="Relationship not found")
-    
+
     # Delete the association
-    association = books_1.delete().where(
-        (books_1.c.authors == author_id) & 
-        (books_1.c.books == book_id)
-    )
-    database.execute(association)
-    database.commit()
-    
-    return {"message": "Book removed from books successfully"}
+    await database.execute(
+        DELETE_BOOK_AUTHOR_ASSOC, {"book_id": book_id, "author_id": author_id})
+    await database.commit()
+
+    return Response(status_code=204)
 
 
 @app.get("/author/{author_id}/books/", response_model=None, tags=["Author Relationships"])
-async def get_books_of_author(author_id: int, database: Session = Depends(get_db)):
+async def get_books_of_author(author_id: int, database: AsyncSession = Depends(get_db)):
     """Get all Book entities related to this Author through books"""
-    db_author = database.query(Author).filter(Author.id == author_id).first()
-    if db_author is None:
-        raise HTTPException(status_code=404, detail="Author not found")
-    
-    book_ids = database.query(books_1.c.books).filter(books_1.c.authors == author_id).all()
-    book_list = database.query(Book).filter(Book.id.in_([id[0] for id in book_ids])).all()
-    
+    # Single join replaces the two-step ID fetch + IN query
+    book_list = (await database.execute(
+        select(Book).join(books_1, Book.id == books_1.c.books).where(books_1.c.authors == author_id)
+    )).scalars().all()
+    if not book_list:
+        # Only verify the author exists when the join came back empty
+        if await database.scalar(select(Author.id).where(Author.id == author_id)) is None:
+            raise HTTPException(status_code=404, detail="Author not found")
+
     return {
         "author_id": author_id,
         "books_count": len(book_list),
@@ -1022,76 +1109,83 @@ async def get_books_of_author(author_id: int, database: Session = Depends(get_db
 
 
 
-
 ############################################
 #
 #   Library functions
 #
 ############################################
- 
- 
+
+
 
 @app.get("/library/", response_model=None, tags=["Library"])
-def get_all_library(detailed: bool = False, database: Session = Depends(get_db)) -> list:
-    from sqlalchemy.orm import joinedload
-    
+async def get_all_library(detailed: bool = False, database: AsyncSession = Depends(get_db)) -> list:
     # Use detailed=true to get entities with eagerly loaded relationships (for tables with lookup columns)
     if detailed:
-        # Eagerly load all relationships to avoid N+1 queries
-        query = database.query(Library)
-        library_list = query.all()
-        
-        # Serialize with relationships included
-        result = []
-        for library_item in library_list:
-            item_dict = library_item.__dict__.copy()
-            item_dict.pop('_sa_instance_state', None)
-            
-            # Add many-to-one relationships (foreign keys for lookup columns)
-            
-            # Add many-to-many and one-to-many relationship objects (full details)
-            book_list = database.query(Book).join(books, Book.id == books.c.books).filter(books.c.library == library_item.id).all()
-            item_dict['books'] = []
-            for book_obj in book_list:
-                book_dict = book_obj.__dict__.copy()
-                book_dict.pop('_sa_instance_state', None)
-                item_dict['books'].append(book_dict)
-            
-            result.append(item_dict)
-        return result
+        # Eagerly load all relationships in one batched IN query to avoid N+1 queries,
+        # and stream the JSON array so memory stays O(batch size) for large tables
+        stmt = (
+            select(Library)
+            .options(selectinload(Library.books))
+            .execution_options(yield_per=500)
+        )
+        result = await database.stream(stmt)
+
+        async def generate():
+            yield b"["
+            first = True
+            async for library_item in result.scalars():
+                if not first:
+                    yield b","
+                first = False
+                yield orjson.dumps(LibraryDetailed.model_validate(library_item).model_dump())
+            yield b"]"
+
+        return StreamingResponse(generate(), media_type="application/json")
     else:
         # Default: return flat entities (faster for charts/widgets without lookup columns)
-        return database.query(Library).all()
+        return (await database.execute(select(Library))).scalars().all()
 
 
 @app.get("/library/count/", response_model=None, tags=["Library"])
-def get_count_library(database: Session = Depends(get_db)) -> dict:
+async def get_count_library(database: AsyncSession = Depends(get_db)) -> dict:
     """Get the total count of Library entities"""
-    count = database.query(Library).count()
-    return {"count": count}
+    cache_key = f"library:count:{query_cache.version('library')}"
+    cached = query_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    count = await database.scalar(select(func.count()).select_from(Library))
+    result = {"count": count}
+    query_cache.set(cache_key, result)
+    return result
 
 
 @app.get("/library/paginated/", response_model=None, tags=["Library"])
-def get_paginated_library(skip: int = 0, limit: int = 100, detailed: bool = False, database: Session = Depends(get_db)) -> dict:
+async def get_paginated_library(skip: int = 0, limit: int = 100, detailed: bool = False, include_total: bool = True, database: AsyncSession = Depends(get_db)) -> dict:
     """Get paginated list of Library entities"""
-    total = database.query(Library).count()
-    library_list = database.query(Library).offset(skip).limit(limit).all()
+    # The COUNT is its own round-trip; infinite-scroll clients can pass
+    # include_total=false to skip it
+    total = await database.scalar(select(func.count()).select_from(Library)) if include_total else None
     # By default, return flat entities (for charts/widgets)
     # Use detailed=true to get entities with relationships
     if not detailed:
+        library_list = (await database.execute(select(Library).offset(skip).limit(limit))).scalars().all()
         return {
             "total": total,
             "skip": skip,
             "limit": limit,
             "data": library_list
         }
-    
+
+    # Fetch the page and its related IDs in one query instead of 1+N
+    library_list = (await database.execute(
+        select(Library).options(selectinload(Library.books).load_only(Book.id))
+        .offset(skip).limit(limit)
+    )).scalars().all()
     result = []
     for library_item in library_list:
-        book_ids = database.query(books.c.books).filter(books.c.library == library_item.id).all()
         item_data = {
-            "library": library_item,
-            "book_ids": [x[0] for x in book_ids],
+            "library": LibraryRead.model_validate(library_item),
+            "book_ids": [book.id for book in library_item.books],
         }
         result.append(item_data)
     return {
@@ -1103,24 +1197,24 @@ def get_paginated_library(skip: int = 0, limit: int = 100, detailed: bool = Fals
 
 
 @app.get("/library/search/", response_model=None, tags=["Library"])
-def search_library(
-    database: Session = Depends(get_db)
+async def search_library(
+    database: AsyncSession = Depends(get_db)
 ) -> list:
     """Search Library entities by attributes"""
-    query = database.query(Library)
-    
-    
-    results = query.all()
+    query = select(Library)
+
+
+    results = (await database.execute(query)).scalars().all()
     return results
 
 
-@app.get("/library/{library_id}/", response_model=None, tags=["Library"])
-async def get_library(library_id: int, database: Session = Depends(get_db)) -> Library:
-    db_library = database.query(Library).filter(Library.id == library_id).first()
+@app.get("/library/{library_id}/", response_model=LibraryResponse, tags=["Library"])
+async def get_library(library_id: int, database: AsyncSession = Depends(get_db)) -> Library:
+    db_library = await database.get(Library, library_id)
     if db_library is None:
         raise HTTPException(status_code=404, detail="Library not found")
 
-    book_ids = database.query(books.c.books).filter(books.c.library == db_library.id).all()
+    book_ids = (await database.execute(BOOK_IDS_BY_LIBRARY, {"library_id": db_library.id})).all()
     response_data = {
         "library": db_library,
         "book_ids": [x[0] for x in book_ids],
@@ -1129,35 +1223,34 @@ async def get_library(library_id: int, database: Session = Depends(get_db)) -> L
 
 
 
-@app.post("/library/", response_model=None, tags=["Library"])
-async def create_library(library_data: LibraryCreate, database: Session = Depends(get_db)) -> Library:
+@app.post("/library/", response_model=LibraryResponse, tags=["Library"])
+async def create_library(library_data: LibraryCreate, database: AsyncSession = Depends(get_db)) -> Library:
 
     if library_data.books:
-        for id in library_data.books:
-            # Entity already validated before creation
-            db_book = database.query(Book).filter(Book.id == id).first()
-            if not db_book:
-                raise HTTPException(status_code=404, detail=f"Book with ID {id} not found")
+        # Validate all referenced entities with a single IN query
+        found = set((await database.execute(select(Book.id).where(Book.id.in_(library_data.books)))).scalars())
+        missing = set(library_data.books) - found
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Book with ID {sorted(missing)} not found")
 
     db_library = Library(
         name=library_data.name        )
 
     database.add(db_library)
-    database.commit()
-    database.refresh(db_library)
-
+    await database.flush()  # Assign db_library.id without committing
 
     if library_data.books:
-        for id in library_data.books:
-            # Entity already validated before creation
-            db_book = database.query(Book).filter(Book.id == id).first()
-            # Create the association
-            association = books.insert().values(library=db_library.id, books=db_book.id)
-            database.execute(association)
-            database.commit()
-
-    
-    book_ids = database.query(books.c.books).filter(books.c.library == db_library.id).all()
+        # executemany: one INSERT round-trip for all association rows
+        await database.execute(
+            books.insert(),
+            [{"library": db_library.id, "books": id} for id in library_data.books],
+        )
+    await database.commit()
+    # No refresh needed: the flush assigned the PK and expire_on_commit=False
+    # keeps the instance's attributes loaded after commit
+
+    query_cache.invalidate("library")
+    book_ids = (await database.execute(BOOK_IDS_BY_LIBRARY, {"library_id": db_library.id})).all()
     response_data = {
         "library": db_library,
         "book_ids": [x[0] for x in book_ids],
@@ -1166,28 +1259,18 @@ async def create_library(library_data: LibraryCreate, database: Session = Depend
 
 
 @app.post("/library/bulk/", response_model=None, tags=["Library"])
-async def bulk_create_library(items: list[LibraryCreate], database: Session = Depends(get_db)) -> dict:
+async def bulk_create_library(items: list[LibraryCreate], database: AsyncSession = Depends(get_db)) -> dict:
     """Create multiple Library entities at once"""
+    # Core executemany INSERT in fixed-size batches; one transaction overall
     created_items = []
-    errors = []
-    
-    for idx, item_data in enumerate(items):
-        try:
-            # Basic validation for each item
-            
-            db_library = Library(
-                name=item_data.name            )
-            database.add(db_library)
-            database.flush()  # Get ID without committing
-            created_items.append(db_library.id)
-        except Exception as e:
-            errors.append({"index": idx, "error": str(e)})
-    
-    if errors:
-        database.rollback()
-        raise HTTPException(status_code=400, detail={"message": "Bulk creation failed", "errors": errors})
-    
-    database.commit()
+    it = iter(items)
+    while chunk := list(itertools.islice(it, BULK_INSERT_BATCH_SIZE)):
+        chunk_rows = [{"name": item_data.name} for item_data in chunk]
+        result = await database.execute(insert(Library).returning(Library.id), chunk_rows)
+        created_items.extend(r[0] for r in result)
+
+    await database.commit()
+    query_cache.invalidate("library")
     return {
         "created_count": len(created_items),
         "created_ids": created_items,
@@ -1196,54 +1279,64 @@ async def bulk_create_library(items: list[LibraryCreate], database: Session = De
 
 
 @app.delete("/library/bulk/", response_model=None, tags=["Library"])
-async def bulk_delete_library(ids: list[int], database: Session = Depends(get_db)) -> dict:
+async def bulk_delete_library(ids: list[int], database: AsyncSession = Depends(get_db)) -> dict:
     """Delete multiple Library entities at once"""
-    deleted_count = 0
-    not_found = []
-    
-    for item_id in ids:
-        db_library = database.query(Library).filter(Library.id == item_id).first()
-        if db_library:
-            database.delete(db_library)
-            deleted_count += 1
-        else:
-            not_found.append(item_id)
-    
-    database.commit()
-    
+    # One existence query + one set-based DELETE instead of 2N statements
+    found = set((await database.execute(select(Library.id).where(Library.id.in_(ids)))).scalars())
+    not_found = [item_id for item_id in ids if item_id not in found]
+
+    if found:
+        # Clean up association rows explicitly; set-based DELETE bypasses ORM cascades
+        await database.execute(books.delete().where(books.c.library.in_(found)))
+        await database.execute(delete(Library).where(Library.id.in_(found)))
+    deleted_count = len(found)
+
+    await database.commit()
+    query_cache.invalidate("library")
+
     return {
         "deleted_count": deleted_count,
         "not_found": not_found,
         "message": f"Successfully deleted {deleted_count} Library entities"
     }
 
-@app.put("/library/{library_id}/", response_model=None, tags=["Library"])
-async def update_library(library_id: int, library_data: LibraryCreate, database: Session = Depends(get_db)) -> Library:
-    db_library = database.query(Library).filter(Library.id == library_id).first()
+@app.put("/library/{library_id}/", response_model=LibraryResponse, tags=["Library"])
+async def update_library(library_id: int, library_data: LibraryCreate, database: AsyncSession = Depends(get_db)) -> Library:
+    db_library = await database.get(Library, library_id)
     if db_library is None:
         raise HTTPException(status_code=404, detail="Library not found")
 
-    setattr(db_library, 'name', library_data.name)
-    existing_book_ids = [assoc.books for assoc in database.execute(
-        books.select().where(books.c.library == db_library.id))]
-    
-    books_to_remove = set(existing_book_ids) - set(library_data.books)
-    for book_id in books_to_remove:
-        association = books.delete().where(
-            (books.c.library == db_library.id) & (books.c.books == book_id))
-        database.execute(association)
-
-    new_book_ids = set(library_data.books) - set(existing_book_ids)
-    for book_id in new_book_ids:
-        db_book = database.query(Book).filter(Book.id == book_id).first()
-        if db_book is None:
-            raise HTTPException(status_code=404, detail=f"Book with ID {book_id} not found")
-        association = books.insert().values(books=db_book.id, library=db_library.id)
-        database.execute(association)
-    database.commit()
-    database.refresh(db_library)
-    
-    book_ids = database.query(books.c.books).filter(books.c.library == db_library.id).all()
+    # Only mark the attribute dirty when it actually changed; an unconditional
+    # setattr would make the flush emit an UPDATE on rename-free requests
+    if db_library.name != library_data.name:
+        setattr(db_library, 'name', library_data.name)
+    existing_book_ids = {assoc.books for assoc in await database.execute(
+        books.select().where(books.c.library == db_library.id))}
+
+    requested_book_ids = set(library_data.books)
+    if requested_book_ids != existing_book_ids:
+        books_to_remove = existing_book_ids - requested_book_ids
+        if books_to_remove:
+            await database.execute(books.delete().where(
+                (books.c.library == db_library.id) & (books.c.books.in_(books_to_remove))))
+
+        new_book_ids = requested_book_ids - existing_book_ids
+        if new_book_ids:
+            # Validate all referenced entities with a single IN query
+            found = set((await database.execute(select(Book.id).where(Book.id.in_(new_book_ids)))).scalars())
+            missing = new_book_ids - found
+            if missing:
+                raise HTTPException(status_code=404, detail=f"Book with ID {sorted(missing)} not found")
+            # executemany: one INSERT round-trip for all association rows
+            await database.execute(
+                books.insert(),
+                [{"library": db_library.id, "books": book_id} for book_id in new_book_ids],
+            )
+    await database.commit()
+    await database.refresh(db_library)
+    query_cache.invalidate("library")
+
+    book_ids = (await database.execute(BOOK_IDS_BY_LIBRARY, {"library_id": db_library.id})).all()
     response_data = {
         "library": db_library,
         "book_ids": [x[0] for x in book_ids],
@@ -1252,79 +1345,77 @@ async def update_library(library_id: int, library_data: LibraryCreate, database:
 
 
 @app.delete("/library/{library_id}/", response_model=None, tags=["Library"])
-async def delete_library(library_id: int, database: Session = Depends(get_db)):
-    db_library = database.query(Library).filter(Library.id == library_id).first()
+async def delete_library(library_id: int, database: AsyncSession = Depends(get_db)):
+    db_library = (await database.execute(
+        select(Library).options(selectinload(Library.books)).where(Library.id == library_id)
+    )).scalar_one_or_none()
     if db_library is None:
         raise HTTPException(status_code=404, detail="Library not found")
-    database.delete(db_library)
-    database.commit()
-    return db_library
+    await database.delete(db_library)
+    await database.commit()
+    query_cache.invalidate("library")
+    # 204: nothing to serialize, and the instance is already detached
+    return Response(status_code=204)
 
 @app.post("/library/{library_id}/books/{book_id}/", response_model=None, tags=["Library Relationships"])
-async def add_books_to_library(library_id: int, book_id: int, database: Session = Depends(get_db)):
+async def add_books_to_library(library_id: int, book_id: int, database: AsyncSession = Depends(get_db)):
     """Add a Book to this Library's books relationship"""
-    db_library = database.query(Library).filter(Library.id == library_id).first()
-    if db_library is None:
+    # One round-trip for all three checks instead of three serial SELECTs
+    flags = (await database.execute(select(
+        exists().where(Library.id == library_id).label("library_exists"),
+        exists().where(Book.id == book_id).label("book_exists"),
+    ))).one()
+    if not flags.library_exists:
         raise HTTPException(status_code=404, detail="Library not found")
-    
-    db_book = database.query(Book).filter(Book.id == book_id).first()
-    if db_book is None:
+    if not flags.book_exists:
         raise HTTPException(status_code=404, detail="Book not found")
-    
-    # Check if relationship already exists
-    existing = database.query(books).filter(
-        (books.c.library == library_id) & 
-        (books.c.books == book_id)
-    ).first()
-    
-    if existing:
+
+    # Create the association; ON CONFLICT DO NOTHING folds the existence
+    # check into the insert and is race-free under concurrent requests
+    result = await database.execute(
+        INSERT_BOOK_LIBRARY_ASSOC, {"book_id": book_id, "library_id": library_id})
+    await database.commit()
+
+    if result.rowcount == 0:
         raise HTTPException(status_code=400, detail="Relationship already exists")
-    
-    # Create the association
-    association = books.insert().values(library=library_id, books=book_id)
-    database.execute(association)
-    database.commit()
-    
+
     return {"message": "Book added to books successfully"}
 
 
 @app.delete("/library/{library_id}/books/{book_id}/", response_model=None, tags=["Library Relationships"])
-async def remove_books_from_library(library_id: int, book_id: int, database: Session = Depends(get_db)):
+async def remove_books_from_library(library_id: int, book_id: int, database: AsyncSession = Depends(get_db)):
     """Remove a Book from this Library's books relationship"""
-    db_library = database.query(Library).filter(Library.id == library_id).first()
+    db_library = await database.get(Library, library_id)
     if db_library is None:
         raise HTTPException(status_code=404, detail="Library not found")
-    
+
     # Check if relationship exists
-    existing = database.query(books).filter(
-        (books.c.library == library_id) & 
-        (books.c.books == book_id)
-    ).first()
-    
+    existing = (await database.execute(
+        BOOK_LIBRARY_ASSOC_EXISTS, {"book_id": book_id, "library_id": library_id})).first()
+
     if not existing:
         raise HTTPException(status_code=404, detail="Relationship not found")
-    
+
     # Delete the association
-    association = books.delete().where(
-        (books.c.library == library_id) & 
-        (books.c.books == book_id)
-    )
-    database.execute(association)
-    database.commit()
-    
-    return {"message": "Book removed from books successfully"}
+    await database.execute(
+        DELETE_BOOK_LIBRARY_ASSOC, {"book_id": book_id, "library_id": library_id})
+    await database.commit()
+
+    return Response(status_code=204)
 
 
 @app.get("/library/{library_id}/books/", response_model=None, tags=["Library Relationships"])
-async def get_books_of_library(library_id: int, database: Session = Depends(get_db)):
+async def get_books_of_library(library_id: int, database: AsyncSession = Depends(get_db)):
     """Get all Book entities related to this Library through books"""
-    db_library = database.query(Library).filter(Library.id == library_id).first()
-    if db_library is None:
-        raise HTTPException(status_code=404, detail="Library not found")
-    
-    book_ids = database.query(books.c.books).filter(books.c.library == library_id).all()
-    book_list = database.query(Book).filter(Book.id.in_([id[0] for id in book_ids])).all()
-    
+    # Single join replaces the two-step ID fetch + IN query
+    book_list = (await database.execute(
+        select(Book).join(books, Book.id == books.c.books).where(books.c.library == library_id)
+    )).scalars().all()
+    if not book_list:
+        # Only verify the library exists when the join came back empty
+        if await database.scalar(select(Library.id).where(Library.id == library_id)) is None:
+            raise HTTPException(status_code=404, detail="Library not found")
+
     return {
         "library_id": library_id,
         "books_count": len(book_list),
@@ -1342,7 +1433,16 @@ async def get_books_of_library(library_id: int, database: Session = Depends(get_
 ############################################
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(
+        "main_api:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=os.cpu_count(),
+        loop="uvloop",
+        http="httptools",
+        log_level="warning",
+        access_log=False,
+    )
 
 
 
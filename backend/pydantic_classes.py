@@ -1,7 +1,7 @@
 from datetime import datetime, date, time
 from typing import List, Optional, Union, Set
 from enum import Enum
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, ConfigDict, field_validator
 
 
 ############################################
@@ -39,3 +39,64 @@ class LibraryCreate(BaseModel):
     books: List[int]  # N:M Relationship
 
 
+############################################
+# Read models are defined here
+# (validated from ORM attributes; Pydantic v2 runs these in compiled code)
+############################################
+class BookRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    id: int
+    pages: int
+    time: time
+    stock: int
+    price: float
+    release: date
+    title: str
+
+
+class AuthorRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    id: int
+    name: str
+
+
+class LibraryRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    id: int
+    name: str
+
+
+class BookDetailed(BookRead):
+    authors: List[AuthorRead]
+    library: List[LibraryRead]
+
+
+class AuthorDetailed(AuthorRead):
+    books: List[BookRead]
+
+
+class LibraryDetailed(LibraryRead):
+    books: List[BookRead]
+
+
+############################################
+# Response envelopes for single-entity endpoints
+# (entity plus related IDs; lets FastAPI use the compiled serializer
+# instead of falling back to the generic encoder on ORM instances)
+############################################
+class BookResponse(BaseModel):
+    book: BookRead
+    author_ids: List[int]
+    library_ids: List[int]
+
+
+class AuthorResponse(BaseModel):
+    author: AuthorRead
+    book_ids: List[int]
+
+
+class LibraryResponse(BaseModel):
+    library: LibraryRead
+    book_ids: List[int]
+
+
@@ -1,7 +1,7 @@
 import enum
 from typing import List, Optional
 from sqlalchemy import (
-    create_engine, Column, ForeignKey, Table, Text, Boolean, String, Date, 
+    Column, ForeignKey, Index, Table, Text, Boolean, String, Date,
     Time, DateTime, Float, Integer, Enum
 )
 from sqlalchemy.orm import (
@@ -28,6 +28,15 @@ books = Table(
     Column("library", ForeignKey("library.id"), primary_key=True),
 )
 
+# The books_1 composite PK leads with authors, so the frequent filters on the
+# books column would otherwise scan the table; this index covers them and its
+# unique flag lets the DB enforce one association row per (book, author) pair.
+# The books table already leads its PK with the books column.
+Index("ix_books_1_books_authors", books_1.c.books, books_1.c.authors, unique=True)
+# The books composite PK leads with the books column, so filters on library
+# (books-of-a-library reads, association cleanup on delete) need this index.
+Index("ix_books_library", books.c.library)
+
 # Tables definition
 class Book(Base):
     __tablename__ = "book"
@@ -51,18 +60,17 @@ class Library(Base):
 
 
 #--- Relationships of the book table
-Book.authors: Mapped[List["Author"]] = relationship("Author", secondary=books_1, back_populates="books")
-Book.library: Mapped[List["Library"]] = relationship("Library", secondary=books, back_populates="books")
+# lazy="raise" so accidental lazy loads fail loudly; endpoints eager-load with selectinload
+Book.authors: Mapped[List["Author"]] = relationship("Author", secondary=books_1, back_populates="books", lazy="raise")
+Book.library: Mapped[List["Library"]] = relationship("Library", secondary=books, back_populates="books", lazy="raise")
 
 #--- Relationships of the author table
-Author.books: Mapped[List["Book"]] = relationship("Book", secondary=books_1, back_populates="authors")
+Author.books: Mapped[List["Book"]] = relationship("Book", secondary=books_1, back_populates="authors", lazy="raise")
 
 #--- Relationships of the library table
-Library.books: Mapped[List["Book"]] = relationship("Book", secondary=books, back_populates="library")
-
-# Database connection
-DATABASE_URL = "sqlite:///Class_Diagram.db"  # SQLite connection
-engine = create_engine(DATABASE_URL, echo=True)
+Library.books: Mapped[List["Book"]] = relationship("Book", secondary=books, back_populates="library", lazy="raise")
 
-# Create tables in the database
-Base.metadata.create_all(engine, checkfirst=True)
\ No newline at end of file
+# No engine here: the API builds its async engine (and runs create_all) in
+# main_api.init_db. A module-level sync engine would only re-create the
+# schema as an import-time side effect, writing a stray SQLite file into
+# whatever directory imports this module.
\ No newline at end of file